@@ -1,11 +1,16 @@
 import streamlit as st
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
-import random
+from typing import NamedTuple
+
+try:
+    from numba import njit, prange
+except ImportError:
+    # Numba is unavailable (e.g. on PyPy); run the kernels as plain Python
+    prange = range
+
+    def njit(*args, **kwargs):
+        return lambda func: func
 
 # Set page configuration
 st.set_page_config(
@@ -16,7 +21,10 @@ st.set_page_config(
 )
 
 # Custom CSS for better styling
-st.markdown("""
+@st.cache_resource
+def _inject_css():
+    """Build the custom stylesheet once per process."""
+    return """
     <style>
     .main {
         padding: 1rem 1rem;
@@ -50,7 +58,9 @@ st.markdown("""
     .risk-medium {color: orange;}
     .risk-high {color: red;}
     </style>
-""", unsafe_allow_html=True)
+"""
+
+st.markdown(_inject_css(), unsafe_allow_html=True)
 
 # Sample property database
 SAMPLE_PROPERTIES = [
@@ -104,6 +114,50 @@ SAMPLE_PROPERTIES = [
     },
 ]
 
+# Property types offered in the property details form
+PROPERTY_TYPES = ["Single Family", "Apartment", "Condo", "Multi-Family", "Commercial"]
+
+# Form defaults when entering custom property details
+CUSTOM_DEFAULTS = {
+    "price": 300000,
+    "rental_income": 2000,
+    "expenses": 600,
+    "property_type": "Single Family",
+    "area": 1500,
+    "age": 15,
+    "vacancy_rate": 5.0,
+    "appreciation_rate": 3.0,
+}
+
+# Sample property database as struct-of-arrays, one contiguous array per field
+_NAMES = [prop["name"] for prop in SAMPLE_PROPERTIES]
+_PRICES = np.fromiter((prop["price"] for prop in SAMPLE_PROPERTIES), dtype=np.float64)
+_INCOMES = np.fromiter((prop["rental_income"] for prop in SAMPLE_PROPERTIES), dtype=np.float64)
+_EXPENSES = np.fromiter((prop["expenses"] for prop in SAMPLE_PROPERTIES), dtype=np.float64)
+_AREAS = np.fromiter((prop["area"] for prop in SAMPLE_PROPERTIES), dtype=np.float64)
+_AGES = np.fromiter((prop["age"] for prop in SAMPLE_PROPERTIES), dtype=np.float64)
+_VACANCY_RATES = np.fromiter((prop["vacancy_rate"] for prop in SAMPLE_PROPERTIES), dtype=np.float64)
+_APPRECIATION_RATES = np.fromiter((prop["appreciation_rate"] for prop in SAMPLE_PROPERTIES), dtype=np.float64)
+_LOCATIONS = np.array([prop["location"] for prop in SAMPLE_PROPERTIES], dtype=object)
+_PROPERTY_TYPES = np.array([prop["property_type"] for prop in SAMPLE_PROPERTIES], dtype=object)
+
+@st.cache_resource
+def _load_sample_properties():
+    """Index the sample property database by name for direct lookup."""
+    return pd.DataFrame({
+        "price": _PRICES,
+        "rental_income": _INCOMES,
+        "expenses": _EXPENSES,
+        "location": _LOCATIONS,
+        "property_type": _PROPERTY_TYPES,
+        "area": _AREAS,
+        "age": _AGES,
+        "vacancy_rate": _VACANCY_RATES,
+        "appreciation_rate": _APPRECIATION_RATES,
+    }, index=pd.Index(_NAMES, name="name"))
+
+SAMPLE_PROPERTIES_DF = _load_sample_properties()
+
 # Define market conditions
 MARKET_CONDITIONS = {
     "Strong Growth": {"vacancy_impact": -2, "appreciation_impact": 2, "price_trend": 5},
@@ -112,83 +166,161 @@ MARKET_CONDITIONS = {
     "Volatile": {"vacancy_impact": 2, "appreciation_impact": 1, "price_trend": 0},
 }
 
-def calculate_metrics(price, rental_income, expenses, down_payment, loan_rate, loan_term, 
+# Horizons (years) for the future value projections in calculate_metrics
+_FV_HORIZONS = np.array([5, 10, 20])
+
+# Risk factor thresholds; a value at or above the i-th threshold scores i + 2
+_THRESHOLDS = {
+    "vacancy": np.array([5, 8]),
+    "p2r": np.array([15, 20]),
+    "expense": np.array([35, 45]),
+    "age": np.array([10, 30]),
+}
+
+# Risk factor description adjectives, indexed by score - 1
+_ADJ_VACANCY = ("low", "moderate", "high")
+_ADJ_P2R = ("good", "fair", "poor")
+_ADJ_EXP = ("favorable", "typical", "concerning")
+_ADJ_MARKET = ("low", "moderate", "high")
+_ADJ_AGE = ("low", "moderate", "high")
+
+# Risk level names and CSS classes, indexed by score - 1
+_RISK_LEVELS = ("Low", "Medium", "High")
+_RISK_CLASSES = ("risk-low", "risk-medium", "risk-high")
+
+# Market condition risk scores (1 = low, 3 = high)
+_MARKET_RISK_SCORES = {"Strong Growth": 1, "Stable": 1, "Volatile": 2, "Declining": 3}
+
+# Market conditions encoded as small-int codes for the batch risk kernel
+_MARKET_CODES = {name: code for code, name in enumerate(MARKET_CONDITIONS)}
+_MARKET_VACANCY_IMPACT = np.array([cond["vacancy_impact"] for cond in MARKET_CONDITIONS.values()], dtype=np.float64)
+_MARKET_SCORE_TABLE = np.array([_MARKET_RISK_SCORES[name] for name in MARKET_CONDITIONS], dtype=np.float64)
+
+@njit(cache=True)
+def _pmt(rate, nper, pv):
+    """Fixed periodic payment that amortizes a loan of pv over nper periods."""
+    if nper == 0:
+        return 0.0
+    if rate == 0:
+        return pv / nper
+    c = (1 + rate) ** nper
+    return (pv * rate * c) / (c - 1)
+
+class Metrics(NamedTuple):
+    """Key investment metrics, in the order returned by _calculate_metrics."""
+    monthly_cash_flow: float
+    annual_cash_flow: float
+    roi: float
+    cap_rate: float
+    cash_on_cash: float
+    mortgage_payment: float
+    break_even_months: float
+    tax_savings: float
+    after_tax_cash_flow: float
+    future_value_5yr: float
+    future_value_10yr: float
+    future_value_20yr: float
+    total_equity_5yr: float
+    total_equity_10yr: float
+    initial_investment: float
+
+@njit("f8[::1](f8,f8,f8,f8,f8,f8,f8,f8,f8,f8,f8,f8,f8)", cache=True)
+def _calculate_metrics(price, rental_income, expenses, down_payment, loan_rate, loan_term, 
                     vacancy_rate, appreciation_rate, tax_rate, closing_costs, renovation_costs, 
-                    annual_income_growth=2, annual_expense_growth=3):
-    """Calculate key real estate investment metrics."""
+                    annual_income_growth, annual_expense_growth):
+    """Compiled metric kernel; returns the values in Metrics field order."""
     
     # Initial investment calculation
     initial_investment = down_payment + closing_costs + renovation_costs
     
     # Loan details
     loan_amount = price - down_payment
-    monthly_interest_rate = loan_rate / 12 / 100 if loan_rate > 0 else 0
-    num_payments = loan_term * 12 if loan_term > 0 else 0
+    monthly_interest_rate = loan_rate * (1.0 / 1200.0) if loan_rate > 0 else 0.0
+    num_payments = loan_term * 12 if loan_term > 0 else 0.0
     
     # Monthly mortgage payment (Principal and Interest)
     if loan_amount > 0 and monthly_interest_rate > 0 and num_payments > 0:
-        mortgage_payment = (loan_amount * monthly_interest_rate * (1 + monthly_interest_rate)**num_payments) / \
-                        ((1 + monthly_interest_rate)**num_payments - 1)
+        mortgage_payment = _pmt(monthly_interest_rate, num_payments, loan_amount)
     else:
-        mortgage_payment = 0
+        mortgage_payment = 0.0
     
     # Effective rental income (accounting for vacancy)
     effective_rental_income = rental_income * (1 - vacancy_rate / 100)
     
+    # Annualized income and costs
+    annual_effective = effective_rental_income * 12
+    annual_expenses = expenses * 12
+    annual_mortgage = mortgage_payment * 12
+    
     # Monthly cash flow
     monthly_cash_flow = effective_rental_income - expenses - mortgage_payment
-    annual_cash_flow = monthly_cash_flow * 12
+    annual_cash_flow = annual_effective - annual_expenses - annual_mortgage
     
     # ROI (Return on Investment)
-    roi = (annual_cash_flow / initial_investment) * 100 if initial_investment > 0 else 0
+    roi = (annual_cash_flow / initial_investment) * 100 if initial_investment > 0 else 0.0
     
     # Cap Rate
-    cap_rate = ((effective_rental_income - expenses) * 12 / price) * 100 if price > 0 else 0
+    cap_rate = ((annual_effective - annual_expenses) / price) * 100 if price > 0 else 0.0
     
     # Cash-on-Cash Return
-    cash_on_cash = (annual_cash_flow / initial_investment) * 100 if initial_investment > 0 else 0
+    cash_on_cash = (annual_cash_flow / initial_investment) * 100 if initial_investment > 0 else 0.0
     
     # Break-even point (months)
-    break_even = initial_investment / monthly_cash_flow if monthly_cash_flow > 0 else float('inf')
+    break_even = initial_investment / monthly_cash_flow if monthly_cash_flow > 0 else np.inf
     
     # Tax calculations
     depreciation_period = 27.5  # years for residential real estate
     annual_depreciation = (price - (price * 0.2)) / depreciation_period  # assuming land is 20% of property value
     
-    taxable_income = effective_rental_income * 12 - expenses * 12 - annual_depreciation - mortgage_payment * 12 * loan_rate / 100
-    tax_savings = max(0, taxable_income * tax_rate / 100)
+    taxable_income = annual_effective - annual_expenses - annual_depreciation - annual_mortgage * loan_rate / 100
+    tax_savings = max(0.0, taxable_income * tax_rate / 100)
     
     # After-tax cash flow
     after_tax_cash_flow = annual_cash_flow + tax_savings
     
     # Property appreciation
-    future_value_5yr = price * (1 + appreciation_rate / 100) ** 5
-    future_value_10yr = price * (1 + appreciation_rate / 100) ** 10
-    future_value_20yr = price * (1 + appreciation_rate / 100) ** 20
+    future_values = price * np.power(1 + appreciation_rate / 100, _FV_HORIZONS)
+    future_value_5yr = future_values[0]
+    future_value_10yr = future_values[1]
+    future_value_20yr = future_values[2]
     
     # Loan amortization
     remaining_balance = loan_amount
     total_equity_5yr = future_value_5yr - remaining_balance if loan_term >= 5 else future_value_5yr
     total_equity_10yr = future_value_10yr - remaining_balance if loan_term >= 10 else future_value_10yr
     
-    return {
-        "monthly_cash_flow": monthly_cash_flow,
-        "annual_cash_flow": annual_cash_flow,
-        "roi": roi,
-        "cap_rate": cap_rate,
-        "cash_on_cash": cash_on_cash,
-        "mortgage_payment": mortgage_payment,
-        "break_even_months": break_even,
-        "tax_savings": tax_savings,
-        "after_tax_cash_flow": after_tax_cash_flow,
-        "future_value_5yr": future_value_5yr,
-        "future_value_10yr": future_value_10yr,
-        "future_value_20yr": future_value_20yr,
-        "total_equity_5yr": total_equity_5yr,
-        "total_equity_10yr": total_equity_10yr,
-        "initial_investment": initial_investment,
-    }
+    return np.array([
+        monthly_cash_flow,
+        annual_cash_flow,
+        roi,
+        cap_rate,
+        cash_on_cash,
+        mortgage_payment,
+        break_even,
+        tax_savings,
+        after_tax_cash_flow,
+        future_value_5yr,
+        future_value_10yr,
+        future_value_20yr,
+        total_equity_5yr,
+        total_equity_10yr,
+        initial_investment,
+    ])
+
+@st.cache_data(max_entries=64)
+def calculate_metrics(price, rental_income, expenses, down_payment, loan_rate, loan_term, 
+                    vacancy_rate, appreciation_rate, tax_rate, closing_costs, renovation_costs, 
+                    annual_income_growth=2, annual_expense_growth=3):
+    """Calculate key real estate investment metrics."""
+    values = _calculate_metrics(
+        float(price), float(rental_income), float(expenses), float(down_payment),
+        float(loan_rate), float(loan_term), float(vacancy_rate), float(appreciation_rate),
+        float(tax_rate), float(closing_costs), float(renovation_costs),
+        float(annual_income_growth), float(annual_expense_growth)
+    )
+    return Metrics._make(values.tolist())
 
+@st.cache_data(max_entries=64)
 def calculate_cash_flow_projection(price, rental_income, expenses, down_payment, loan_rate, loan_term, 
                                 vacancy_rate, appreciation_rate, years=10, 
                                 annual_income_growth=2, annual_expense_growth=3):
@@ -196,47 +328,41 @@ def calculate_cash_flow_projection(price, rental_income, expenses, down_payment,
     
     # Initial values
     loan_amount = price - down_payment
-    monthly_interest_rate = loan_rate / 12 / 100
+    monthly_interest_rate = loan_rate * (1.0 / 1200.0)
     num_payments = loan_term * 12
     
     # Calculate mortgage payment
     if loan_amount > 0 and monthly_interest_rate > 0 and num_payments > 0:
-        mortgage_payment = (loan_amount * monthly_interest_rate * (1 + monthly_interest_rate)**num_payments) / \
-                        ((1 + monthly_interest_rate)**num_payments - 1)
+        mortgage_payment = _pmt(float(monthly_interest_rate), float(num_payments), float(loan_amount))
     else:
         mortgage_payment = 0
         
-    projection_data = []
-    
-    for year in range(1, years + 1):
-        # Adjusted for growth
-        year_rental_income = rental_income * ((1 + annual_income_growth / 100) ** (year - 1))
-        year_expenses = expenses * ((1 + annual_expense_growth / 100) ** (year - 1))
-        
-        # Account for vacancy
-        effective_rental_income = year_rental_income * (1 - vacancy_rate / 100)
-        
-        # Calculate annual values
-        annual_mortgage = mortgage_payment * 12
-        annual_income = effective_rental_income * 12
-        annual_expenses = year_expenses * 12
-        annual_cash_flow = annual_income - annual_expenses - annual_mortgage
-        
-        # Property value with appreciation
-        property_value = price * ((1 + appreciation_rate / 100) ** year)
-        
-        projection_data.append({
-            "year": year,
-            "property_value": property_value,
-            "annual_income": annual_income,
-            "annual_expenses": annual_expenses,
-            "annual_mortgage": annual_mortgage,
-            "annual_cash_flow": annual_cash_flow,
-            "cumulative_cash_flow": annual_cash_flow * year  # Simplified cumulative
-        })
-        
-    return projection_data
+    # Growth factors for each projection year
+    years_arr = np.arange(1, years + 1)
+    income_factor = (1 + annual_income_growth / 100) ** (years_arr - 1)
+    expense_factor = (1 + annual_expense_growth / 100) ** (years_arr - 1)
+    appreciation_factor = (1 + appreciation_rate / 100) ** years_arr
+    
+    # Calculate annual values (income accounts for vacancy)
+    annual_income = rental_income * income_factor * (1 - vacancy_rate / 100) * 12
+    annual_expenses = expenses * expense_factor * 12
+    annual_mortgage = np.full_like(years_arr, mortgage_payment * 12, dtype=float)
+    annual_cash_flow = annual_income - annual_expenses - annual_mortgage
+    
+    # Property value with appreciation
+    property_value = price * appreciation_factor
+    
+    return pd.DataFrame({
+        "year": years_arr,
+        "property_value": property_value,
+        "annual_income": annual_income,
+        "annual_expenses": annual_expenses,
+        "annual_mortgage": annual_mortgage,
+        "annual_cash_flow": annual_cash_flow,
+        "cumulative_cash_flow": np.cumsum(annual_cash_flow)
+    })
 
+@st.cache_data(max_entries=64)
 def analyze_risk(price, vacancy_rate, expenses, rental_income, market_condition, property_age, location):
     """Analyze investment risk based on multiple factors."""
     
@@ -249,30 +375,37 @@ def analyze_risk(price, vacancy_rate, expenses, rental_income, market_condition,
     # Expense ratio
     expense_ratio = (expenses * 12) / (rental_income * 12) * 100
     
+    # Risk factor scores (1 = low, 3 = high)
+    vacancy_score = int(np.searchsorted(_THRESHOLDS["vacancy"], adjusted_vacancy, side="right")) + 1
+    p2r_score = int(np.searchsorted(_THRESHOLDS["p2r"], price_to_rent, side="right")) + 1
+    expense_score = int(np.searchsorted(_THRESHOLDS["expense"], expense_ratio, side="right")) + 1
+    market_score = _MARKET_RISK_SCORES[market_condition]
+    age_score = int(np.searchsorted(_THRESHOLDS["age"], property_age, side="right")) + 1
+    
     # Risk factors
     risk_factors = {
         "Vacancy Risk": {
-            "score": 1 if adjusted_vacancy < 5 else (2 if adjusted_vacancy < 8 else 3),
+            "score": vacancy_score,
             "description": f"Adjusted vacancy rate of {adjusted_vacancy}% indicates "
-                        f"{'low' if adjusted_vacancy < 5 else ('moderate' if adjusted_vacancy < 8 else 'high')} risk."
+                        f"{_ADJ_VACANCY[vacancy_score - 1]} risk."
         },
         "Price to Rent Ratio": {
-            "score": 1 if price_to_rent < 15 else (2 if price_to_rent < 20 else 3),
+            "score": p2r_score,
             "description": f"Price to annual rent ratio of {price_to_rent:.1f} indicates "
-                        f"{'good' if price_to_rent < 15 else ('fair' if price_to_rent < 20 else 'poor')} cash flow potential."
+                        f"{_ADJ_P2R[p2r_score - 1]} cash flow potential."
         },
         "Expense Ratio": {
-            "score": 1 if expense_ratio < 35 else (2 if expense_ratio < 45 else 3),
+            "score": expense_score,
             "description": f"Expense ratio of {expense_ratio:.1f}% is "
-                        f"{'favorable' if expense_ratio < 35 else ('typical' if expense_ratio < 45 else 'concerning')}."
+                        f"{_ADJ_EXP[expense_score - 1]}."
         },
         "Market Condition": {
-            "score": 1 if market_condition in ["Strong Growth", "Stable"] else (2 if market_condition == "Volatile" else 3),
-            "description": f"{market_condition} market suggests {('low' if market_condition in ['Strong Growth', 'Stable'] else ('moderate' if market_condition == 'Volatile' else 'high'))} risk."
+            "score": market_score,
+            "description": f"{market_condition} market suggests {_ADJ_MARKET[market_score - 1]} risk."
         },
         "Property Age": {
-            "score": 1 if property_age < 10 else (2 if property_age < 30 else 3),
-            "description": f"{property_age} year old property has {('low' if property_age < 10 else ('moderate' if property_age < 30 else 'high'))} maintenance risk."
+            "score": age_score,
+            "description": f"{property_age} year old property has {_ADJ_AGE[age_score - 1]} maintenance risk."
         }
     }
     
@@ -296,6 +429,88 @@ def analyze_risk(price, vacancy_rate, expenses, rental_income, market_condition,
         "factors": risk_factors
     }
 
+@njit(cache=True, parallel=True)
+def _risk_scores(prices, vacancy, expenses, income, market_codes, ages,
+                vacancy_thresholds, p2r_thresholds, expense_thresholds, age_thresholds,
+                market_vacancy_impact, market_scores):
+    """Average risk score per property; mirrors the scoring in analyze_risk."""
+    n = prices.shape[0]
+    scores = np.empty(n)
+    for i in prange(n):
+        code = market_codes[i]
+        adjusted_vacancy = vacancy[i] + market_vacancy_impact[code]
+        price_to_rent = prices[i] / (income[i] * 12)
+        expense_ratio = expenses[i] / income[i] * 100
+        total = (np.searchsorted(vacancy_thresholds, adjusted_vacancy, side="right")
+                + np.searchsorted(p2r_thresholds, price_to_rent, side="right")
+                + np.searchsorted(expense_thresholds, expense_ratio, side="right")
+                + np.searchsorted(age_thresholds, ages[i], side="right")
+                + 4 + market_scores[code])
+        scores[i] = total / 5
+    return scores
+
+def analyze_risk_batch(prices, vacancy_rates, expenses, rental_incomes, market_conditions, property_ages):
+    """Score the overall investment risk of a whole property catalog at once."""
+    market_codes = np.array([_MARKET_CODES[cond] for cond in market_conditions], dtype=np.int64)
+    return _risk_scores(
+        np.asarray(prices, dtype=np.float64),
+        np.asarray(vacancy_rates, dtype=np.float64),
+        np.asarray(expenses, dtype=np.float64),
+        np.asarray(rental_incomes, dtype=np.float64),
+        market_codes,
+        np.asarray(property_ages, dtype=np.float64),
+        _THRESHOLDS["vacancy"], _THRESHOLDS["p2r"], _THRESHOLDS["expense"], _THRESHOLDS["age"],
+        _MARKET_VACANCY_IMPACT, _MARKET_SCORE_TABLE
+    )
+
+@st.cache_resource
+def _get_plotly():
+    """Import Plotly Express on first use so it stays off the startup path."""
+    import plotly.express as px
+    return px
+
+@st.cache_data(max_entries=64)
+def _build_cashflow_fig(df_projections):
+    """Build the annual cash flow bar chart for a projection."""
+    px = _get_plotly()
+    fig = px.bar(
+        df_projections, 
+        x="year", 
+        y="annual_cash_flow",
+        labels={"year": "Year", "annual_cash_flow": "Cash Flow ($)"},
+        color_discrete_sequence=["#4e8df5"]
+    )
+    fig.update_layout(
+        title="Annual Cash Flow Projection",
+        xaxis_title="Year",
+        yaxis_title="Cash Flow ($)",
+        hovermode="x unified"
+    )
+    return fig
+
+@st.cache_data(max_entries=64)
+def _build_value_fig(df_projections):
+    """Build the property value line chart for a projection."""
+    px = _get_plotly()
+    fig = px.line(
+        df_projections, 
+        x="year", 
+        y="property_value",
+        labels={"year": "Year", "property_value": "Property Value ($)"},
+        color_discrete_sequence=["#4CAF50"]
+    )
+    fig.update_layout(
+        title="Property Value Projection",
+        xaxis_title="Year",
+        yaxis_title="Property Value ($)",
+        hovermode="x unified"
+    )
+    return fig
+
+def _metric_card(label, value, cls=""):
+    """Render a single metric as one HTML card."""
+    return f"<div class='metric-container'><div>{label}</div><div class='{cls}'><h3>{value}</h3></div></div>"
+
 def display_metrics_dashboard(metrics):
     """Display investment metrics in a nice dashboard layout."""
     
@@ -303,45 +518,31 @@ def display_metrics_dashboard(metrics):
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.markdown("<div class='metric-container'>", unsafe_allow_html=True)
-        st.metric("Monthly Cash Flow", f"${metrics['monthly_cash_flow']:.2f}")
-        st.markdown("</div>", unsafe_allow_html=True)
+        st.markdown(_metric_card("Monthly Cash Flow", f"${metrics.monthly_cash_flow:.2f}"), unsafe_allow_html=True)
         
     with col2:
-        st.markdown("<div class='metric-container'>", unsafe_allow_html=True)
-        st.metric("Cash-on-Cash Return", f"{metrics['cash_on_cash']:.2f}%")
-        st.markdown("</div>", unsafe_allow_html=True)
+        st.markdown(_metric_card("Cash-on-Cash Return", f"{metrics.cash_on_cash:.2f}%"), unsafe_allow_html=True)
         
     with col3:
-        st.markdown("<div class='metric-container'>", unsafe_allow_html=True)
-        st.metric("Cap Rate", f"{metrics['cap_rate']:.2f}%")
-        st.markdown("</div>", unsafe_allow_html=True)
+        st.markdown(_metric_card("Cap Rate", f"{metrics.cap_rate:.2f}%"), unsafe_allow_html=True)
         
     with col4:
-        st.markdown("<div class='metric-container'>", unsafe_allow_html=True)
-        st.metric("ROI", f"{metrics['roi']:.2f}%")
-        st.markdown("</div>", unsafe_allow_html=True)
+        st.markdown(_metric_card("ROI", f"{metrics.roi:.2f}%"), unsafe_allow_html=True)
         
     # Second row of metrics
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.markdown("<div class='metric-container'>", unsafe_allow_html=True)
-        if metrics['break_even_months'] != float('inf'):
-            st.metric("Break-Even (months)", f"{metrics['break_even_months']:.1f}")
+        if metrics.break_even_months != float('inf'):
+            st.markdown(_metric_card("Break-Even (months)", f"{metrics.break_even_months:.1f}"), unsafe_allow_html=True)
         else:
-            st.metric("Break-Even", "N/A")
-        st.markdown("</div>", unsafe_allow_html=True)
+            st.markdown(_metric_card("Break-Even", "N/A"), unsafe_allow_html=True)
         
     with col2:
-        st.markdown("<div class='metric-container'>", unsafe_allow_html=True)
-        st.metric("Initial Investment", f"${metrics['initial_investment']:,.2f}")
-        st.markdown("</div>", unsafe_allow_html=True)
+        st.markdown(_metric_card("Initial Investment", f"${metrics.initial_investment:,.2f}"), unsafe_allow_html=True)
         
     with col3:
-        st.markdown("<div class='metric-container'>", unsafe_allow_html=True)
-        st.metric("Monthly Mortgage", f"${metrics['mortgage_payment']:.2f}")
-        st.markdown("</div>", unsafe_allow_html=True)
+        st.markdown(_metric_card("Monthly Mortgage", f"${metrics.mortgage_payment:.2f}"), unsafe_allow_html=True)
 
 def main():
     """Main application function for the Real Estate Investment Analyzer."""
@@ -367,95 +568,54 @@ def main():
         if use_sample:
             sample_property = st.selectbox(
                 "Select a sample property", 
-                options=[prop["name"] for prop in SAMPLE_PROPERTIES],
+                options=_NAMES,
                 index=0
             )
             
             # Get selected property data
-            selected_property = next(prop for prop in SAMPLE_PROPERTIES if prop["name"] == sample_property)
-            
-            # Display sample property details
-            st.write("##### Property Information")
-            col1, col2 = st.columns(2)
-            with col1:
-                price = st.number_input("Purchase Price ($)", value=selected_property["price"], min_value=0)
-                rental_income = st.number_input("Monthly Rental Income ($)", value=selected_property["rental_income"], min_value=0)
-                expenses = st.number_input("Monthly Expenses ($)", value=selected_property["expenses"], min_value=0)
-            with col2:
-                property_type = st.text_input("Property Type", value=selected_property["property_type"])
-                area = st.number_input("Area (sq ft)", value=selected_property["area"], min_value=0)
-                property_age = st.number_input("Property Age (years)", value=selected_property["age"], min_value=0)
-                
-            st.write("##### Financial Details")
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                down_payment_percent = st.slider("Down Payment (%)", min_value=1, max_value=100, value=20)
-                down_payment = price * down_payment_percent / 100
-                st.write(f"Down Payment: ${down_payment:,.2f}")
-            with col2:
-                loan_rate = st.number_input("Loan Interest Rate (%)", value=5.5, min_value=0.0, max_value=20.0, step=0.1)
-            with col3:
-                loan_term = st.number_input("Loan Term (years)", value=30, min_value=1, max_value=50)
-            
-            st.write("##### Market Conditions")
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                vacancy_rate = st.number_input("Vacancy Rate (%)", value=selected_property["vacancy_rate"], min_value=0.0, max_value=100.0, step=0.5)
-            with col2:
-                appreciation_rate = st.number_input("Annual Appreciation Rate (%)", value=selected_property["appreciation_rate"], min_value=-10.0, max_value=20.0, step=0.1)
-            with col3:
-                market_condition = st.selectbox("Market Condition", options=list(MARKET_CONDITIONS.keys()), index=1)
-            
-            st.write("##### Additional Costs")
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                closing_costs = st.number_input("Closing Costs ($)", value=round(price * 0.03), min_value=0)
-            with col2:
-                renovation_costs = st.number_input("Renovation Costs ($)", value=0, min_value=0)
-            with col3:
-                tax_rate = st.number_input("Income Tax Rate (%)", value=25.0, min_value=0.0, max_value=50.0, step=0.5)
-        
+            defaults = SAMPLE_PROPERTIES_DF.loc[sample_property].to_dict()
         else:
-            # Custom input fields if not using sample data
-            st.write("##### Property Information")
-            col1, col2 = st.columns(2)
-            with col1:
-                price = st.number_input("Purchase Price ($)", value=300000, min_value=0)
-                rental_income = st.number_input("Monthly Rental Income ($)", value=2000, min_value=0)
-                expenses = st.number_input("Monthly Expenses ($)", value=600, min_value=0)
-            with col2:
-                property_type = st.selectbox("Property Type", options=["Single Family", "Apartment", "Condo", "Multi-Family", "Commercial"])
-                area = st.number_input("Area (sq ft)", value=1500, min_value=0)
-                property_age = st.number_input("Property Age (years)", value=15, min_value=0)
-                
-            st.write("##### Financial Details")
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                down_payment_percent = st.slider("Down Payment (%)", min_value=1, max_value=100, value=20)
-                down_payment = price * down_payment_percent / 100
-                st.write(f"Down Payment: ${down_payment:,.2f}")
-            with col2:
-                loan_rate = st.number_input("Loan Interest Rate (%)", value=5.5, min_value=0.0, max_value=20.0, step=0.1)
-            with col3:
-                loan_term = st.number_input("Loan Term (years)", value=30, min_value=1, max_value=50)
-            
-            st.write("##### Market Conditions")
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                vacancy_rate = st.number_input("Vacancy Rate (%)", value=5.0, min_value=0.0, max_value=100.0, step=0.5)
-            with col2:
-                appreciation_rate = st.number_input("Annual Appreciation Rate (%)", value=3.0, min_value=-10.0, max_value=20.0, step=0.1)
-            with col3:
-                market_condition = st.selectbox("Market Condition", options=list(MARKET_CONDITIONS.keys()), index=1)
+            defaults = CUSTOM_DEFAULTS
+        
+        st.write("##### Property Information")
+        col1, col2 = st.columns(2)
+        with col1:
+            price = st.number_input("Purchase Price ($)", value=int(defaults["price"]), min_value=0)
+            rental_income = st.number_input("Monthly Rental Income ($)", value=int(defaults["rental_income"]), min_value=0)
+            expenses = st.number_input("Monthly Expenses ($)", value=int(defaults["expenses"]), min_value=0)
+        with col2:
+            property_type = st.selectbox("Property Type", options=PROPERTY_TYPES, index=PROPERTY_TYPES.index(defaults["property_type"]))
+            area = st.number_input("Area (sq ft)", value=int(defaults["area"]), min_value=0)
+            property_age = st.number_input("Property Age (years)", value=int(defaults["age"]), min_value=0)
             
-            st.write("##### Additional Costs")
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                closing_costs = st.number_input("Closing Costs ($)", value=round(price * 0.03), min_value=0)
-            with col2:
-                renovation_costs = st.number_input("Renovation Costs ($)", value=0, min_value=0)
-            with col3:
-                tax_rate = st.number_input("Income Tax Rate (%)", value=25.0, min_value=0.0, max_value=50.0, step=0.5)
+        st.write("##### Financial Details")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            down_payment_percent = st.slider("Down Payment (%)", min_value=1, max_value=100, value=20)
+            down_payment = price * down_payment_percent / 100
+            st.write(f"Down Payment: ${down_payment:,.2f}")
+        with col2:
+            loan_rate = st.number_input("Loan Interest Rate (%)", value=5.5, min_value=0.0, max_value=20.0, step=0.1)
+        with col3:
+            loan_term = st.number_input("Loan Term (years)", value=30, min_value=1, max_value=50)
+        
+        st.write("##### Market Conditions")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            vacancy_rate = st.number_input("Vacancy Rate (%)", value=float(defaults["vacancy_rate"]), min_value=0.0, max_value=100.0, step=0.5)
+        with col2:
+            appreciation_rate = st.number_input("Annual Appreciation Rate (%)", value=float(defaults["appreciation_rate"]), min_value=-10.0, max_value=20.0, step=0.1)
+        with col3:
+            market_condition = st.selectbox("Market Condition", options=list(MARKET_CONDITIONS.keys()), index=1)
+        
+        st.write("##### Additional Costs")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            closing_costs = st.number_input("Closing Costs ($)", value=round(price * 0.03), min_value=0)
+        with col2:
+            renovation_costs = st.number_input("Renovation Costs ($)", value=0, min_value=0)
+        with col3:
+            tax_rate = st.number_input("Income Tax Rate (%)", value=25.0, min_value=0.0, max_value=50.0, step=0.5)
             
         # Advanced options (optional, collapses by default)
         with st.expander("Advanced Options"):
@@ -468,17 +628,37 @@ def main():
         # Calculate button
         analyze_button = st.button("Analyze Investment", type="primary")
         
-    # Results section
-    with tabs[1]:
-        if 'analyze_button' in locals() and analyze_button:
-            st.header("Investment Analysis Results")
-            
-            # Calculate metrics
-            metrics = calculate_metrics(
+        # Persist results so they survive reruns triggered by other widgets
+        if analyze_button:
+            st.session_state["metrics"] = calculate_metrics(
                 price, rental_income, expenses, down_payment, loan_rate, loan_term,
                 vacancy_rate, appreciation_rate, tax_rate, closing_costs, renovation_costs, 
                 annual_income_growth, annual_expense_growth
             )
+            st.session_state["projection_inputs"] = {
+                "price": price,
+                "rental_income": rental_income,
+                "expenses": expenses,
+                "down_payment": down_payment,
+                "loan_rate": loan_rate,
+                "loan_term": loan_term,
+                "vacancy_rate": vacancy_rate,
+                "appreciation_rate": appreciation_rate,
+                "annual_income_growth": annual_income_growth,
+                "annual_expense_growth": annual_expense_growth,
+            }
+            # Determine location based on property type if not explicitly provided
+            location = "Urban" if property_type in ["Apartment", "Condo"] else "Suburban"
+            st.session_state["risk_analysis"] = analyze_risk(price, vacancy_rate, expenses, rental_income, 
+                                                        market_condition, property_age, location)
+        
+    # Results section
+    with tabs[1]:
+        if "metrics" in st.session_state:
+            st.header("Investment Analysis Results")
+            
+            metrics = st.session_state["metrics"]
+            price = st.session_state["projection_inputs"]["price"]
             
             # Display metrics dashboard
             display_metrics_dashboard(metrics)
@@ -489,111 +669,78 @@ def main():
                 
                 with col1:
                     st.subheader("Cash Flow Metrics")
-                    st.write(f"Monthly Cash Flow: ${metrics['monthly_cash_flow']:.2f}")
-                    st.write(f"Annual Cash Flow: ${metrics['annual_cash_flow']:.2f}")
-                    st.write(f"After-Tax Cash Flow: ${metrics['after_tax_cash_flow']:.2f}")
-                    st.write(f"Monthly Mortgage Payment: ${metrics['mortgage_payment']:.2f}")
+                    st.write(f"Monthly Cash Flow: ${metrics.monthly_cash_flow:.2f}")
+                    st.write(f"Annual Cash Flow: ${metrics.annual_cash_flow:.2f}")
+                    st.write(f"After-Tax Cash Flow: ${metrics.after_tax_cash_flow:.2f}")
+                    st.write(f"Monthly Mortgage Payment: ${metrics.mortgage_payment:.2f}")
                     
                 with col2:
                     st.subheader("Investment Return Metrics")
-                    st.write(f"Cash-on-Cash Return: {metrics['cash_on_cash']:.2f}%")
-                    st.write(f"Cap Rate: {metrics['cap_rate']:.2f}%")
-                    st.write(f"ROI: {metrics['roi']:.2f}%")
-                    if metrics['break_even_months'] != float('inf'):
-                        st.write(f"Break-Even Point: {metrics['break_even_months']:.1f} months")
+                    st.write(f"Cash-on-Cash Return: {metrics.cash_on_cash:.2f}%")
+                    st.write(f"Cap Rate: {metrics.cap_rate:.2f}%")
+                    st.write(f"ROI: {metrics.roi:.2f}%")
+                    if metrics.break_even_months != float('inf'):
+                        st.write(f"Break-Even Point: {metrics.break_even_months:.1f} months")
                     else:
                         st.write("Break-Even Point: N/A (negative cash flow)")
                         
                 st.subheader("Future Value Projections")
                 col1, col2, col3 = st.columns(3)
                 with col1:
-                    st.metric("5-Year Value", f"${metrics['future_value_5yr']:,.2f}", 
-                            f"{((metrics['future_value_5yr'] - price) / price) * 100:.1f}%")
+                    st.metric("5-Year Value", f"${metrics.future_value_5yr:,.2f}", 
+                            f"{((metrics.future_value_5yr - price) / price) * 100:.1f}%")
                 with col2:
-                    st.metric("10-Year Value", f"${metrics['future_value_10yr']:,.2f}", 
-                            f"{((metrics['future_value_10yr'] - price) / price) * 100:.1f}%")
+                    st.metric("10-Year Value", f"${metrics.future_value_10yr:,.2f}", 
+                            f"{((metrics.future_value_10yr - price) / price) * 100:.1f}%")
                 with col3:
-                    st.metric("20-Year Value", f"${metrics['future_value_20yr']:,.2f}", 
-                            f"{((metrics['future_value_20yr'] - price) / price) * 100:.1f}%")
+                    st.metric("20-Year Value", f"${metrics.future_value_20yr:,.2f}", 
+                            f"{((metrics.future_value_20yr - price) / price) * 100:.1f}%")
                 
-                st.write(f"Total Equity (5 years): ${metrics['total_equity_5yr']:,.2f}")
-                st.write(f"Total Equity (10 years): ${metrics['total_equity_10yr']:,.2f}")
+                st.write(f"Total Equity (5 years): ${metrics.total_equity_5yr:,.2f}")
+                st.write(f"Total Equity (10 years): ${metrics.total_equity_10yr:,.2f}")
                 
         else:
             st.info("Complete the property details in the 'Property Details' tab and click 'Analyze Investment' to view results.")
     
     # Cash Flow Projections
     with tabs[2]:
-        if 'analyze_button' in locals() and analyze_button:
+        if "projection_inputs" in st.session_state:
             st.header("Cash Flow Projections")
             
             # Calculate projections
             projection_years = st.slider("Projection Period (years)", min_value=5, max_value=30, value=10)
-            projections = calculate_cash_flow_projection(
-                price, rental_income, expenses, down_payment, loan_rate, loan_term,
-                vacancy_rate, appreciation_rate, projection_years, 
-                annual_income_growth, annual_expense_growth
+            df_projections = calculate_cash_flow_projection(
+                **st.session_state["projection_inputs"], years=projection_years
             )
             
-            # Convert projections to DataFrame
-            df_projections = pd.DataFrame(projections)
-            
             # Display cash flow chart
             st.subheader("Annual Cash Flow")
-            fig = px.bar(
-                df_projections, 
-                x="year", 
-                y="annual_cash_flow",
-                labels={"year": "Year", "annual_cash_flow": "Cash Flow ($)"},
-                color_discrete_sequence=["#4e8df5"]
-            )
-            fig.update_layout(
-                title="Annual Cash Flow Projection",
-                xaxis_title="Year",
-                yaxis_title="Cash Flow ($)",
-                hovermode="x unified"
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(_build_cashflow_fig(df_projections), use_container_width=True)
             
             # Display property value chart
             st.subheader("Property Value Appreciation")
-            fig = px.line(
-                df_projections, 
-                x="year", 
-                y="property_value",
-                labels={"year": "Year", "property_value": "Property Value ($)"},
-                color_discrete_sequence=["#4CAF50"]
-            )
-            fig.update_layout(
-                title="Property Value Projection",
-                xaxis_title="Year",
-                yaxis_title="Property Value ($)",
-                hovermode="x unified"
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(_build_value_fig(df_projections), use_container_width=True)
             
             # Display detailed projection data
             with st.expander("View Detailed Projection Data"):
-                # Format columns for display
-                display_df = df_projections.copy()
-                for col in ['property_value', 'annual_income', 'annual_expenses', 
-                        'annual_mortgage', 'annual_cash_flow', 'cumulative_cash_flow']:
-                    display_df[col] = display_df[col].apply(lambda x: f"${x:,.2f}")
+                # Format currency columns in the frontend
+                money_cols = ['property_value', 'annual_income', 'annual_expenses', 
+                        'annual_mortgage', 'annual_cash_flow', 'cumulative_cash_flow']
                 
-                st.dataframe(display_df, use_container_width=True)
+                st.dataframe(
+                    df_projections,
+                    use_container_width=True,
+                    column_config={col: st.column_config.NumberColumn(format="$%.2f") for col in money_cols}
+                )
         else:
             st.info("Complete the property details in the 'Property Details' tab and click 'Analyze Investment' to view projections.")
     
     # Risk Assessment
     with tabs[3]:
-        if 'analyze_button' in locals() and analyze_button:
+        if "risk_analysis" in st.session_state:
             st.header("Risk Assessment")
             
-            # Calculate risk metrics
-            # Determine location based on property type if not explicitly provided
-            location = "Urban" if property_type in ["Apartment", "Condo"] else "Suburban"
-            risk_analysis = analyze_risk(price, vacancy_rate, expenses, rental_income, 
-                                        market_condition, property_age, location)
+            risk_analysis = st.session_state["risk_analysis"]
             
             # Display overall risk
             st.subheader("Overall Investment Risk")
@@ -608,24 +755,19 @@ def main():
             
             # Create columns to display risk factors
             col1, col2 = st.columns(2)
+            factor_items = list(risk_analysis["factors"].items())
             
-            with col1:
-                for i, (factor_name, factor_data) in enumerate(list(risk_analysis["factors"].items())[:3]):
-                    risk_class = "risk-low" if factor_data["score"] == 1 else ("risk-medium" if factor_data["score"] == 2 else "risk-high")
-                    st.markdown(f"<div class='metric-container'>", unsafe_allow_html=True)
-                    st.markdown(f"<h4>{factor_name}</h4>", unsafe_allow_html=True)
-                    st.markdown(f"<p class='{risk_class}'>Risk Level: {'Low' if factor_data['score'] == 1 else ('Medium' if factor_data['score'] == 2 else 'High')}</p>", unsafe_allow_html=True)
-                    st.markdown(f"<p>{factor_data['description']}</p>", unsafe_allow_html=True)
-                    st.markdown("</div>", unsafe_allow_html=True)
-            
-            with col2:
-                for i, (factor_name, factor_data) in enumerate(list(risk_analysis["factors"].items())[3:]):
-                    risk_class = "risk-low" if factor_data["score"] == 1 else ("risk-medium" if factor_data["score"] == 2 else "risk-high")
-                    st.markdown(f"<div class='metric-container'>", unsafe_allow_html=True)
-                    st.markdown(f"<h4>{factor_name}</h4>", unsafe_allow_html=True)
-                    st.markdown(f"<p class='{risk_class}'>Risk Level: {'Low' if factor_data['score'] == 1 else ('Medium' if factor_data['score'] == 2 else 'High')}</p>", unsafe_allow_html=True)
-                    st.markdown(f"<p>{factor_data['description']}</p>", unsafe_allow_html=True)
-                    st.markdown("</div>", unsafe_allow_html=True)
+            for col, items in ((col1, factor_items[:3]), (col2, factor_items[3:])):
+                cards = []
+                for factor_name, factor_data in items:
+                    score_index = factor_data["score"] - 1
+                    cards.append(
+                        f"<div class='metric-container'><h4>{factor_name}</h4>"
+                        f"<p class='{_RISK_CLASSES[score_index]}'>Risk Level: {_RISK_LEVELS[score_index]}</p>"
+                        f"<p>{factor_data['description']}</p></div>"
+                    )
+                with col:
+                    st.markdown("".join(cards), unsafe_allow_html=True)
             
             # Display recommendations based on risk
             st.subheader("Investment Recommendations")